@@ -0,0 +1,101 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from workbook_cache import load_tracker_workbook, load_workbooks, stat_workbooks
+
+AGGREGATE_KEYS = ['Date', 'Folder', 'Name']
+AGGREGATE_COLUMNS = AGGREGATE_KEYS + ['Completed_Count', 'Pending_Count', 'Coding_Seconds']
+
+PERIODS = ("Single day", "Week to date", "Month to date", "Custom range")
+
+
+# Completed, pending and coding seconds of one normalized workbook per
+# (Date, Name). Blank dates and names are kept as their own keys: a blank
+# date counts as "today" when queried, and nameless rows still count towards
+# the folder totals.
+def aggregate_workbook(df, folder=""):
+    status = df['Auditor\'s Status']
+    grouped = pd.DataFrame({
+        'Date': df['Date'],
+        'Name': df['Name'],
+        'Completed_Count': (status == 'Completed').astype('int64'),
+        'Pending_Count': (status == 'Pending').astype('int64'),
+        'Coding_Seconds': df['Coding Time (seconds)'].astype(float),
+    }).groupby(['Date', 'Name'], dropna=False, sort=False).sum().reset_index()
+    grouped.insert(1, 'Folder', folder)
+    return grouped[AGGREGATE_COLUMNS]
+
+
+# Parse and aggregate in one step, so worker processes only send back the
+# small aggregate frame
+def aggregate_tracker_workbook(file_path):
+    return aggregate_workbook(load_tracker_workbook(file_path))
+
+
+# First and last day of a reporting period ending on `user_date`
+def period_bounds(period, user_date, start_date=None):
+    end = pd.Timestamp(user_date).normalize()
+    if period == "Week to date":
+        return end - pd.Timedelta(days=end.dayofweek), end
+    if period == "Month to date":
+        return end.replace(day=1), end
+    if period == "Custom range":
+        return pd.Timestamp(start_date).normalize(), end
+    return end, end
+
+
+# Materialized (Date, Folder, Name) aggregates of every workbook under an
+# input folder. Only workbooks whose size or mtime changed are parsed again;
+# their per-file aggregates replace the old ones and the table is re-summed
+# from the per-file pieces, which are small next to the raw rows. Date
+# ranges are then answered from the table without touching the workbooks.
+class DailyAggregates:
+    def __init__(self, input_folder, loader=aggregate_tracker_workbook, workers=1):
+        self._input_folder = input_folder
+        self._loader = loader
+        self._workers = workers
+        self._entries = {}  # path -> ((size, mtime_ns), aggregate frame)
+        self._lock = threading.Lock()
+        self.folders = []  # folder keys in scan order
+        self.table = pd.DataFrame(columns=AGGREGATE_COLUMNS)
+
+    def _folder_key(self, file_path):
+        return os.path.relpath(os.path.dirname(file_path), self._input_folder)
+
+    def sync(self, workbooks):
+        file_paths = [file_path for _, folder_files in workbooks for file_path in folder_files]
+        with self._lock:
+            signatures = stat_workbooks(file_paths)
+            stale = [
+                file_path for file_path, signature in signatures.items()
+                if file_path not in self._entries or self._entries[file_path][0] != signature
+            ]
+            removed = [file_path for file_path in self._entries if file_path not in signatures]
+            for file_path in removed:
+                del self._entries[file_path]
+            for file_path, aggregate in zip(stale, load_workbooks(stale, self._loader, self._workers)):
+                aggregate['Folder'] = self._folder_key(file_path)
+                self._entries[file_path] = (signatures[file_path], aggregate)
+
+            folders = list(dict.fromkeys(self._folder_key(file_path) for file_path in file_paths))
+            if stale or removed or folders != self.folders or not self._entries:
+                self.folders = folders
+                pieces = [aggregate for _, aggregate in self._entries.values()]
+                if pieces:
+                    self.table = (
+                        pd.concat(pieces, ignore_index=True)
+                        .groupby(AGGREGATE_KEYS, dropna=False, sort=False).sum().reset_index()
+                    )
+                else:
+                    self.table = pd.DataFrame(columns=AGGREGATE_COLUMNS)
+            return self.table
+
+    # Aggregate rows whose day falls in [start, end]; blank dates count as
+    # today and, as in the single-day summary, only whole-day dates match
+    def rows_between(self, start, end):
+        table = self.table
+        today = pd.Timestamp.today().normalize()
+        dates = pd.to_datetime(table['Date']).fillna(today)
+        keep = (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end)) & (dates == dates.dt.normalize())
+        return table[np.asarray(keep, dtype=bool)]
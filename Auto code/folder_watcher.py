@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from workbook_cache import list_workbooks, stat_workbooks
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+except ImportError:  # watchdog not installed, fall back to stat polling
+    FileSystemEventHandler = object
+    Observer = PollingObserver = None
+
+
+def _is_workbook(path):
+    name = os.path.basename(path)
+    return name.endswith(".xlsm") and not name.startswith("~$")  # skip Excel lock files
+
+
+class _WorkbookEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path and _is_workbook(path):
+                self._watcher.mark_dirty(path)
+
+
+# Watches an input folder and collects the .xlsm files that changed. Bursts
+# of saves are coalesced: the generation only moves on once the folder has
+# been quiet for `debounce` seconds, and dashboards recompute only then.
+# Uses inotify (or the platform's native API) through watchdog; network
+# shares that do not deliver events can force stat polling instead.
+class FolderWatcher:
+    def __init__(self, input_folder, debounce=2.0, poll_interval=5.0, use_polling=False):
+        self._input_folder = input_folder
+        self._debounce = debounce
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._last_event = 0.0
+        self._stopped = threading.Event()
+        self.generation = 0
+        self.changed = set()  # paths behind the latest generation
+        self._observer = None
+        self._thread = None
+        self._start(use_polling)
+
+    def _start(self, use_polling):
+        if Observer is not None:
+            for observer_cls in ((PollingObserver,) if use_polling else (Observer, PollingObserver)):
+                try:
+                    if observer_cls is PollingObserver:
+                        observer = observer_cls(timeout=self._poll_interval)
+                    else:
+                        observer = observer_cls()
+                    observer.schedule(_WorkbookEventHandler(self), self._input_folder, recursive=True)
+                    observer.daemon = True
+                    observer.start()
+                    self._observer = observer
+                    return
+                except OSError:  # e.g. inotify watch limit reached
+                    continue
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._thread.start()
+
+    def _poll_loop(self):
+        signatures = self._scan()
+        while not self._stopped.wait(self._poll_interval):
+            current = self._scan()
+            for path in set(signatures) | set(current):
+                if signatures.get(path) != current.get(path):
+                    self.mark_dirty(path)
+            signatures = current
+
+    def _scan(self):
+        file_paths = [file_path for _, folder_files in list_workbooks(self._input_folder) for file_path in folder_files]
+        return stat_workbooks(file_path for file_path in file_paths if _is_workbook(file_path))
+
+    def mark_dirty(self, path):
+        with self._lock:
+            self._dirty.add(path)
+            self._last_event = time.monotonic()
+
+    def poll(self):
+        # Publish the dirty set as a new generation once the burst has settled
+        with self._lock:
+            if self._dirty and time.monotonic() - self._last_event >= self._debounce:
+                self.changed = self._dirty
+                self._dirty = set()
+                self.generation += 1
+            return self.generation
+
+    def stop(self):
+        self._stopped.set()
+        if self._observer is not None:
+            self._observer.stop()
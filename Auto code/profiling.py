@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# A copy of audit_core/profiling.py, as this app is deployed on its own;
+# only the log settings below differ between the two
+LOG_ENV = "TRACKER_PROFILE_LOG"
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "stage_timings.jsonl")
+
+_log_lock = threading.Lock()
+
+
+# JSON-lines file the stage records are appended to, from the LOG_ENV
+# variable; an empty value turns the log off
+def profile_log_path():
+    return os.environ.get(LOG_ENV, DEFAULT_LOG)
+
+
+# Resident memory of the process right now (needs psutil). Read before and
+# after each stage, so a stage's figure is its own rather than the run's.
+def current_rss_bytes():
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+# High-water mark of the process's resident memory over its whole life, for
+# run-level reports; it never goes down, so it says nothing about one stage
+def peak_rss_bytes():
+    if psutil is not None and sys.platform == "win32":
+        return psutil.Process().memory_info().peak_wset
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rows(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    return len(result) if hasattr(result, "__len__") and not isinstance(result, (bytes, str)) else None
+
+
+# Wall time, rows in/out and memory of each pipeline stage in one run. Every
+# record is appended to the profile log as it is taken. With trace_memory
+# the stage's peak Python allocation is measured with tracemalloc too,
+# which slows allocation-heavy stages down.
+class StageRecorder:
+    def __init__(self, run, trace_memory=False, log_path=None):
+        self.run = run
+        self.run_id = uuid.uuid4().hex[:12]
+        self.trace_memory = trace_memory
+        self.log_path = profile_log_path() if log_path is None else log_path
+        self.records = []
+
+    def record(self, stage, seconds, rows_in=None, rows_out=None, traced_peak_bytes=None, rss_before_bytes=None):
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "run": self.run,
+            "run_id": self.run_id,
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "rows_in": None if rows_in is None else int(rows_in),
+            "rows_out": None if rows_out is None else int(rows_out),
+            "rss_before_bytes": rss_before_bytes,
+            "rss_after_bytes": current_rss_bytes(),
+            "traced_peak_bytes": traced_peak_bytes,
+        }
+        self.records.append(record)
+        if self.log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with _log_lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    # Run one stage and record it. rows_out is the length of the result (or
+    # of its first element, for stages returning a tuple) unless a function
+    # counting the result's rows is given.
+    def measure(self, stage, func, rows_in=None, rows_out=None):
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            result = func()
+        finally:
+            seconds = time.perf_counter() - start
+            traced_peak = tracemalloc.get_traced_memory()[1] if tracing else None
+            if tracing:
+                tracemalloc.stop()
+        rows = _rows(result) if rows_out is None else rows_out(result)
+        self.record(stage, seconds, rows_in, rows, traced_peak, rss_before)
+        return result
+
+    def frame(self):
+        columns = ["stage", "seconds", "rows_in", "rows_out", "rss_before_bytes", "rss_after_bytes", "traced_peak_bytes"]
+        df = pd.DataFrame(self.records, columns=columns)
+        for col in ("rss_before_bytes", "rss_after_bytes", "traced_peak_bytes"):
+            df[col.replace("_bytes", "_mib")] = pd.to_numeric(df.pop(col)) / 2**20
+        return df
+
+
+# Stand-in when nothing is being recorded
+class NullRecorder:
+    records = []
+
+    def record(self, stage, seconds, rows_in=None, rows_out=None, traced_peak_bytes=None, rss_before_bytes=None):
+        return None
+
+    def measure(self, stage, func, rows_in=None, rows_out=None):
+        return func()
+
+
+NULL_RECORDER = NullRecorder()
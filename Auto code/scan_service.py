@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+# Seconds a shared result is served before the next request rescans, from
+# TRACKER_RESULT_MAX_AGE; the folder watcher's generation invalidates it sooner
+def default_max_age():
+    configured = os.environ.get("TRACKER_RESULT_MAX_AGE", "").strip()
+    return max(float(configured), 0.0) if configured else 30.0
+
+
+# Handed to the waiters of a scan that did not finish
+_RETRY = object()
+
+
+class _Snapshot:
+    def __init__(self, generation, result):
+        self.generation = generation
+        self.result = result
+        self.taken = time.monotonic()
+
+
+# Process-wide scans keyed by (folder, date), shared by every dashboard
+# session. A snapshot is served while it is younger than `max_age` and the
+# watcher generation it was computed for is current. Concurrent requests for
+# a missing or stale key wait on the one scan in flight instead of starting
+# their own, so the file server sees one scan per key however many
+# dashboards are open. A failed scan is not kept and only raises in the
+# session that ran it; its waiters retry.
+class ScanService:
+    def __init__(self, max_age=None):
+        self._max_age = default_max_age() if max_age is None else max_age
+        self._lock = threading.Lock()
+        self._snapshots = {}  # key -> _Snapshot
+        self._inflight = {}  # key -> (generation, Future)
+
+    def _fresh(self, snapshot, generation, now):
+        return snapshot is not None and snapshot.generation == generation and now - snapshot.taken < self._max_age
+
+    def get(self, key, generation, scan):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                snapshot = self._snapshots.get(key)
+                if self._fresh(snapshot, generation, now):
+                    return snapshot.result
+
+                # Drop snapshots nobody has refreshed for a while
+                for stale_key in [k for k, s in self._snapshots.items() if now - s.taken >= 10 * max(self._max_age, 1.0)]:
+                    del self._snapshots[stale_key]
+
+                inflight = self._inflight.get(key)
+                if inflight is not None and inflight[0] == generation:
+                    future, owner = inflight[1], False
+                else:
+                    future, owner = Future(), True
+                    self._inflight[key] = (generation, future)
+
+            if not owner:
+                result = future.result()
+                if result is _RETRY:
+                    continue
+                return result
+
+            finished = False
+            try:
+                result = scan()
+                finished = True
+            finally:
+                if not finished:
+                    # Failed, or the owner's session was stopped or rerun:
+                    # the waiters go round again and one of them rescans
+                    with self._lock:
+                        if self._inflight.get(key, (None, None))[1] is future:
+                            del self._inflight[key]
+                    future.set_result(_RETRY)
+
+            with self._lock:
+                # A slower scan for an older generation must not replace a newer one
+                current = self._snapshots.get(key)
+                if current is None or current.generation <= generation:
+                    self._snapshots[key] = _Snapshot(generation, result)
+                if self._inflight.get(key, (None, None))[1] is future:
+                    del self._inflight[key]
+            future.set_result(result)
+            return result
+
+    def snapshot_age(self, key):
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            return None if snapshot is None else time.monotonic() - snapshot.taken
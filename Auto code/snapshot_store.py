@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import quote
+import pandas as pd
+from workbook_cache import load_tracker_workbook, load_workbooks, stat_workbooks
+
+UNDATED = "undated"
+
+
+# Folder under TRACKER_SNAPSHOT_DIR holding the snapshots of one input folder
+def snapshot_dir_for(snapshot_root, input_folder):
+    digest = hashlib.sha1(os.path.abspath(input_folder).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(snapshot_root, digest)
+
+
+# Parquet needs string column names and one type per column; Excel sheets
+# often mix numbers and text in free-form columns
+def _to_parquet_frame(df):
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype('string')
+    return df
+
+
+# Normalized tracker rows stored on disk as Parquet, partitioned as
+# date=YYYY-MM-DD/folder=<folder relative to the input>/<workbook>.parquet.
+# A manifest records each workbook's size, mtime and part files, so only
+# changed workbooks are re-parsed and rewritten.
+class SnapshotStore:
+    def __init__(self, store_dir, input_folder, loader=load_tracker_workbook, workers=1):
+        self._store_dir = store_dir
+        self._input_folder = input_folder
+        self._loader = loader
+        self._workers = workers
+        self._manifest_path = os.path.join(store_dir, "manifest.json")
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+        self._manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_manifest(self):
+        tmp_path = self._manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _remove_parts(self, file_path):
+        for part in self._manifest.pop(file_path, {}).get("parts", []):
+            try:
+                os.remove(os.path.join(self._store_dir, part))
+            except FileNotFoundError:
+                pass
+
+    def _write_parts(self, file_path, df):
+        folder = os.path.relpath(os.path.dirname(file_path), self._input_folder)
+        part_name = hashlib.sha1(file_path.encode("utf-8")).hexdigest()[:16] + ".parquet"
+
+        # Rows whose Date carries a time of day never match a picked date, so
+        # they are not stored; blank dates go to the "undated" partition
+        dates = df['Date']
+        keep = dates.isna() | (dates == dates.dt.normalize())
+        df = _to_parquet_frame(df[keep])
+        date_keys = df['Date'].dt.strftime('%Y-%m-%d').fillna(UNDATED)
+
+        parts = []
+        for date_key, rows in df.groupby(date_keys, sort=False):
+            part = os.path.join(f"date={date_key}", f"folder={quote(folder, safe='')}", part_name)
+            os.makedirs(os.path.join(self._store_dir, os.path.dirname(part)), exist_ok=True)
+            # Written aside and swapped in, so a part is never seen half-written
+            part_path = os.path.join(self._store_dir, part)
+            rows.to_parquet(part_path + ".tmp", index=False)
+            os.replace(part_path + ".tmp", part_path)
+            parts.append(part)
+        return parts
+
+    def ingest(self, file_paths):
+        # Rewrite the partitions of new or changed workbooks, drop deleted ones
+        with self._lock:
+            signatures = stat_workbooks(file_paths)
+            stale = [
+                file_path for file_path, signature in signatures.items()
+                if self._manifest.get(file_path, {}).get("signature") != list(signature)
+            ]
+            removed = [file_path for file_path in self._manifest if file_path not in signatures]
+            if not stale and not removed:
+                return
+
+            for file_path in removed:
+                self._remove_parts(file_path)
+            for file_path, df in zip(stale, load_workbooks(stale, self._loader, self._workers)):
+                self._remove_parts(file_path)
+                self._manifest[file_path] = {
+                    "signature": list(signatures[file_path]),
+                    "parts": self._write_parts(file_path, df),
+                }
+            self._write_manifest()
+
+    def rows_for_date(self, user_date):
+        # Read only the partition of the selected date (plus the undated rows,
+        # which count as today), keyed by source workbook
+        date_keys = [pd.Timestamp(user_date).strftime('%Y-%m-%d')]
+        if pd.Timestamp(user_date).normalize() == pd.Timestamp.today().normalize():
+            date_keys.append(UNDATED)
+
+        # Parts are read under the lock, so an ingest cannot remove or rewrite
+        # them midway and a date never mixes old and new rows
+        prefixes = tuple(f"date={date_key}" + os.sep for date_key in date_keys)
+        frames = {}
+        with self._lock:
+            for file_path, entry in self._manifest.items():
+                parts = [part for part in entry["parts"] if part.startswith(prefixes)]
+                if parts:
+                    frames[file_path] = pd.concat(
+                        [pd.read_parquet(os.path.join(self._store_dir, part)) for part in parts], ignore_index=True
+                    )
+        return frames
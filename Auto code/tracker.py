@@ -0,0 +1,238 @@
+import argparse
+import os
+import pandas as pd
+from daily_aggregates import DailyAggregates
+from profiling import NULL_RECORDER
+from snapshot_store import SnapshotStore, snapshot_dir_for
+from workbook_cache import WorkbookCache, default_scan_workers, format_hms, list_workbooks, rows_for_date
+
+FOLDER_SUMMARY_COLUMNS = ['Folder', 'Completed_Count', 'Pending_Count', 'Total', 'Total_Coding_Time']
+AUDITOR_SUMMARY_COLUMNS = ['Name', 'Completed_Count', 'Pending_Count', 'Total_Coding_Time', 'Total', 'Folder']
+
+
+# Rows held by a {file: frame} mapping
+def _frame_rows(frames):
+    return sum(len(df) for df in frames.values())
+
+
+# Analysis Function
+def consolidate_and_analyze(input_folder, user_date, workbook_cache=None, snapshot_store=None, recorder=None):
+    recorder = recorder or NULL_RECORDER
+
+    workbooks = recorder.measure(
+        "list_workbooks", lambda: list_workbooks(input_folder),
+        rows_out=lambda workbooks: sum(len(folder_files) for _, folder_files in workbooks),
+    )
+    file_paths = [file_path for _, folder_files in workbooks for file_path in folder_files]
+
+    # Only workbooks that changed since the last refresh are parsed again
+    if snapshot_store is not None:
+        recorder.measure("ingest_snapshots", lambda: snapshot_store.ingest(file_paths), rows_in=len(file_paths))
+        date_frames = recorder.measure("rows_for_date", lambda: snapshot_store.rows_for_date(user_date), rows_out=_frame_rows)
+    else:
+        if workbook_cache is None:
+            workbook_cache = WorkbookCache()
+        frames = recorder.measure("sync_workbooks", lambda: workbook_cache.sync(file_paths), rows_in=len(file_paths), rows_out=_frame_rows)
+        date_frames = recorder.measure(
+            "rows_for_date", lambda: {file_path: rows_for_date(df, user_date) for file_path, df in frames.items()},
+            rows_in=_frame_rows(frames), rows_out=_frame_rows,
+        )
+
+    folder_summary, folder_auditor_summary = recorder.measure(
+        "folder_summaries", lambda: summarize_folders(workbooks, date_frames), rows_in=_frame_rows(date_frames),
+    )
+    return recorder.measure(
+        "overall_summaries", lambda: finish_summaries(folder_summary, folder_auditor_summary),
+        rows_in=sum(len(df) for df in folder_auditor_summary), rows_out=lambda summaries: len(summaries[1]),
+    )
+
+
+# Folder rows and per-folder auditor frames of the rows on one date
+def summarize_folders(workbooks, date_frames):
+    # Initialize summaries
+    folder_summary = []
+    folder_auditor_summary = []
+
+    for folder, file_paths in workbooks:
+        # Initialize folder-level counts
+        folder_completed = 0
+        folder_pending = 0
+        folder_total_coding_time = 0
+
+        # Iterate through each file in the folder
+        folder_data = []
+        for file_path in file_paths:
+            # Rows of this file on the selected date; skip files without any
+            df = date_frames.get(file_path)
+            if df is None or df.empty:
+                continue
+
+            # Append to folder data
+            folder_data.append(df)
+
+            # Update folder-level counts
+            folder_completed += (df['Auditor\'s Status'] == 'Completed').sum()
+            folder_pending += (df['Auditor\'s Status'] == 'Pending').sum()
+            folder_total_coding_time += df['Coding Time (seconds)'].sum()
+
+        # If no data for the folder matches the date, skip it
+        if not folder_data:
+            continue
+
+        # Combine all data for the folder
+        folder_df = pd.concat(folder_data, ignore_index=True)
+
+        # Folder-Wise Summary
+        folder_summary.append({
+            'Folder': folder,
+            'Completed_Count': folder_completed,
+            'Pending_Count': folder_pending,
+            'Total': folder_completed + folder_pending,
+            'Total_Coding_Time': folder_total_coding_time
+        })
+
+        # Folder with Auditor-Wise Summary
+        auditor_df = folder_df.groupby('Name').agg(
+            Completed_Count=('Auditor\'s Status', lambda x: (x == 'Completed').sum()),
+            Pending_Count=('Auditor\'s Status', lambda x: (x == 'Pending').sum()),
+            Total_Coding_Time=('Coding Time (seconds)', 'sum')
+        ).reset_index()
+
+        auditor_df['Total'] = auditor_df['Completed_Count'] + auditor_df['Pending_Count']
+        auditor_df['Folder'] = folder
+        folder_auditor_summary.append(auditor_df)
+
+    return folder_summary, folder_auditor_summary
+
+
+# The same three summaries over every day from start_date to end_date,
+# summed from the materialized (Date, Folder, Name) aggregates; only
+# workbooks that changed since the last sync are read
+def summarize_range(input_folder, start_date, end_date, daily_aggregates=None, recorder=None):
+    recorder = recorder or NULL_RECORDER
+    if daily_aggregates is None:
+        daily_aggregates = DailyAggregates(input_folder)
+
+    table = recorder.measure("sync_aggregates", lambda: daily_aggregates.sync(list_workbooks(input_folder)))
+    rows = recorder.measure("rows_between", lambda: daily_aggregates.rows_between(start_date, end_date), rows_in=len(table))
+    return recorder.measure(
+        "range_summaries", lambda: finish_summaries(*summarize_aggregates(rows, daily_aggregates.folders)),
+        rows_in=len(rows), rows_out=lambda summaries: len(summaries[1]),
+    )
+
+
+# Folder rows and per-folder auditor frames of (Date, Folder, Name)
+# aggregate rows, folders in scan order
+def summarize_aggregates(rows, folders):
+    by_folder = dict(tuple(rows.groupby('Folder', sort=False)))
+
+    folder_summary = []
+    folder_auditor_summary = []
+    for folder_key in folders:
+        df = by_folder.get(folder_key)
+        if df is None or df.empty:
+            continue
+        folder = os.path.basename(folder_key)
+
+        folder_completed = df['Completed_Count'].sum()
+        folder_pending = df['Pending_Count'].sum()
+        folder_summary.append({
+            'Folder': folder,
+            'Completed_Count': folder_completed,
+            'Pending_Count': folder_pending,
+            'Total': folder_completed + folder_pending,
+            'Total_Coding_Time': df['Coding_Seconds'].sum()
+        })
+
+        auditor_df = df.groupby('Name').agg(
+            Completed_Count=('Completed_Count', 'sum'),
+            Pending_Count=('Pending_Count', 'sum'),
+            Total_Coding_Time=('Coding_Seconds', 'sum')
+        ).reset_index()
+        auditor_df['Total'] = auditor_df['Completed_Count'] + auditor_df['Pending_Count']
+        auditor_df['Folder'] = folder
+        folder_auditor_summary.append(auditor_df)
+
+    return folder_summary, folder_auditor_summary
+
+
+# The three summary tables from the per-folder rows and per-folder auditor
+# frames: auditor totals across folders, grand totals, HH:MM:SS times
+def finish_summaries(folder_summary, folder_auditor_summary):
+    # Folder-Wise Summary DataFrame
+    folder_summary_df = pd.DataFrame(folder_summary, columns=FOLDER_SUMMARY_COLUMNS)
+
+    # Folder with Auditor-Wise Summary DataFrame
+    if folder_auditor_summary:
+        folder_auditor_summary_df = pd.concat(folder_auditor_summary, ignore_index=True)
+    else:
+        folder_auditor_summary_df = pd.DataFrame(columns=AUDITOR_SUMMARY_COLUMNS)
+
+    # Auditor-Wise Summary (aggregate across all folders)
+    auditor_summary_df = folder_auditor_summary_df.groupby('Name').agg(
+        Completed_Count=('Completed_Count', 'sum'),
+        Pending_Count=('Pending_Count', 'sum'),
+        Total_Coding_Time=('Total_Coding_Time', 'sum'),
+        Total=('Total', 'sum')
+    ).reset_index()
+
+    # Add Grand Totals
+    def add_grand_totals(df):
+        grand_totals = {
+            'Folder': 'Grand Totals' if 'Folder' in df.columns else None,
+            'Name': 'Grand Totals' if 'Name' in df.columns else None,
+            'Completed_Count': df['Completed_Count'].sum(),
+            'Pending_Count': df['Pending_Count'].sum(),
+            'Total': df['Total'].sum(),
+            'Total_Coding_Time': df['Total_Coding_Time'].sum()
+        }
+        if df.empty:
+            # Nothing fell on the date or range: no rows, not a row of zeros
+            return df.reindex(columns=list(dict.fromkeys([*df.columns, *grand_totals])))
+        return pd.concat([df, pd.DataFrame([grand_totals])], ignore_index=True)
+
+    folder_summary_df = add_grand_totals(folder_summary_df)
+    folder_auditor_summary_df = add_grand_totals(folder_auditor_summary_df)
+    auditor_summary_df = add_grand_totals(auditor_summary_df)
+
+    # Convert Total_Coding_Time from seconds to HH:MM:SS format
+    folder_summary_df['Total_Coding_Time'] = format_hms(folder_summary_df['Total_Coding_Time'])
+    folder_auditor_summary_df['Total_Coding_Time'] = format_hms(folder_auditor_summary_df['Total_Coding_Time'])
+    auditor_summary_df['Total_Coding_Time'] = format_hms(auditor_summary_df['Total_Coding_Time'])
+
+    return folder_summary_df, auditor_summary_df, folder_auditor_summary_df
+
+
+# Headless run: write the three summaries for one date as CSV files
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Folder, auditor and folder x auditor summaries of the tracker workbooks.")
+    parser.add_argument("input_folder")
+    parser.add_argument("--date", default=str(pd.Timestamp.today().date()), help="analysis date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--from", dest="start_date", help="first day of a date range ending on --date, YYYY-MM-DD")
+    parser.add_argument("--output-dir", help="where to write the CSV files (default: the input folder)")
+    parser.add_argument("--workers", type=int, default=default_scan_workers(), help="processes used to parse workbooks")
+    parser.add_argument("--snapshot-dir", default=os.environ.get("TRACKER_SNAPSHOT_DIR", ""), help="Parquet snapshot store to ingest into and read from")
+    args = parser.parse_args(argv)
+    if args.start_date and pd.Timestamp(args.start_date) > pd.Timestamp(args.date):
+        parser.error(f"--from {args.start_date} is after --date {args.date}")
+
+    if args.start_date:
+        aggregates = DailyAggregates(args.input_folder, workers=args.workers)
+        summaries = summarize_range(args.input_folder, args.start_date, args.date, aggregates)
+    elif args.snapshot_dir:
+        store = SnapshotStore(snapshot_dir_for(args.snapshot_dir, args.input_folder), args.input_folder, workers=args.workers)
+        summaries = consolidate_and_analyze(args.input_folder, args.date, snapshot_store=store)
+    else:
+        summaries = consolidate_and_analyze(args.input_folder, args.date, WorkbookCache(workers=args.workers))
+
+    output_dir = args.output_dir or args.input_folder
+    os.makedirs(output_dir, exist_ok=True)
+    for name, summary in zip(("folder_summary", "auditor_summary", "folder_auditor_summary"), summaries):
+        period = f"{args.start_date}_to_{args.date}" if args.start_date else args.date
+        output_path = os.path.join(output_dir, f"{name}_{period}.csv")
+        summary.to_csv(output_path, index=False)
+        print(f"Wrote {output_path}")
+
+
+if __name__ == "__main__":
+    main()
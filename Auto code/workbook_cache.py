@@ -0,0 +1,142 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+# Worker processes used to parse workbooks, from TRACKER_SCAN_WORKERS or the CPU count
+def default_scan_workers():
+    configured = os.environ.get("TRACKER_SCAN_WORKERS", "").strip()
+    return max(int(configured), 1) if configured else (os.cpu_count() or 1)
+
+
+# Walk the input tree the same way the summary always has: every sub-folder
+# at any depth, with the .xlsm files sitting directly inside it
+def list_workbooks(input_folder):
+    workbooks = []
+    for root, dirs, files in os.walk(input_folder):
+        for folder in dirs:
+            folder_path = os.path.join(root, folder)
+            file_paths = [
+                os.path.join(folder_path, file)
+                for file in os.listdir(folder_path)
+                if file.endswith(".xlsm")
+            ]
+            workbooks.append((folder, file_paths))
+    return workbooks
+
+
+# Whole seconds of an Excel day-fraction, truncated per hour/minute/second
+# field like the HH:MM:SS display; blank times count as midnight
+def clock_seconds(values):
+    values = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+    hours = np.trunc(values * 24)
+    minutes = np.trunc((values * 24 * 60) % 60)
+    seconds = np.trunc((values * 24 * 3600) % 60)
+    # A negative hour field negates the whole "-H:MM:SS" duration
+    clock = np.where(hours < 0, hours * 3600 - (minutes * 60 + seconds), hours * 3600 + minutes * 60 + seconds)
+    return np.nan_to_num(clock, nan=0.0)
+
+
+# Format a column of seconds as HH:MM:SS, for display only
+def format_hms(seconds):
+    seconds = pd.Series(seconds, dtype=float)
+    hours = (seconds // 3600).astype('int64').astype(str).str.zfill(2)
+    minutes = ((seconds % 3600) // 60).astype('int64').astype(str).str.zfill(2)
+    secs = (seconds % 60).astype('int64').astype(str).str.zfill(2)
+    return hours + ':' + minutes + ':' + secs
+
+
+# Read one tracker workbook and normalize every row, whatever its date
+def load_tracker_workbook(file_path):
+    df = pd.read_excel(file_path)
+
+    # Handle the Date column
+    if 'Date' in df.columns or 'DATE' in df.columns:
+        date_col = 'Date' if 'Date' in df.columns else 'DATE'
+        df['Date'] = df[date_col]
+    else:
+        df['Date'] = pd.NaT  # If no Date column exists, set as NaN
+
+    # Blank dates stay NaT here; they count as "today" at query time, so a
+    # cached frame does not go stale when the day rolls over
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+
+    # Calculate coding time straight from the Excel day-fractions
+    for time_col in ('START TIME', 'END TIME'):
+        if time_col not in df.columns:
+            df[time_col] = float('nan')
+    start = clock_seconds(df['START TIME'])
+    end = clock_seconds(df['END TIME'])
+    df['Coding Time (seconds)'] = np.maximum(end - start, 0)  # Ensure no negative values
+
+    # Mark Auditor's Status
+    if 'Auditor\'s Status' not in df.columns:
+        df['Auditor\'s Status'] = None
+    df['Auditor\'s Status'] = df['Auditor\'s Status'].fillna('Pending')
+    df['Auditor\'s Status'] = df['Auditor\'s Status'].apply(lambda x: 'Completed' if x != 'Pending' else 'Pending')
+
+    # Standardize Name column
+    if 'Name' not in df.columns and 'NAME' in df.columns:
+        df.rename(columns={'NAME': 'Name'}, inplace=True)
+
+    return df
+
+
+# Rows of a normalized workbook that fall on the selected date
+def rows_for_date(df, user_date):
+    today = pd.Timestamp.today().normalize()
+    return df[df['Date'].fillna(today) == pd.Timestamp(user_date).normalize()]
+
+
+# Size and mtime of each workbook that still exists
+def stat_workbooks(file_paths):
+    signatures = {}
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        signatures[file_path] = (stat.st_size, stat.st_mtime_ns)
+    return signatures
+
+
+# openpyxl parsing is CPU-bound, so a batch of changed files is fanned out to
+# a process pool; a single file is not worth the pool start-up
+def load_workbooks(file_paths, loader=load_tracker_workbook, workers=1):
+    workers = min(workers, len(file_paths))
+    if workers <= 1:
+        return [loader(file_path) for file_path in file_paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(len(file_paths) // (workers * 4), 1)
+        return list(executor.map(loader, file_paths, chunksize=chunksize))
+
+
+# Normalized workbook frames keyed by path, reused for as long as the file's
+# size and mtime are unchanged
+class WorkbookCache:
+    def __init__(self, loader=load_tracker_workbook, workers=1):
+        self._loader = loader
+        self._workers = workers
+        self._entries = {}  # path -> ((size, mtime_ns), frame)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def sync(self, file_paths):
+        # Re-parse only new or changed workbooks and evict the deleted ones
+        with self._lock:
+            signatures = stat_workbooks(file_paths)
+            stale = [
+                file_path for file_path, signature in signatures.items()
+                if file_path not in self._entries or self._entries[file_path][0] != signature
+            ]
+            for file_path, df in zip(stale, load_workbooks(stale, self._loader, self._workers)):
+                self._entries[file_path] = (signatures[file_path], df)
+
+            for file_path in set(self._entries) - set(signatures):
+                del self._entries[file_path]
+
+            return {file_path: self._entries[file_path][1] for file_path in signatures}
@@ -0,0 +1,4 @@
+import sys
+from audit_core.cli import main
+
+sys.exit(main())
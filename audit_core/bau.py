@@ -0,0 +1,164 @@
+import time
+import numpy as np
+import pandas as pd
+
+from audit_core.profiles import category_mask, load_registry
+from audit_core.profiling import NULL_RECORDER, current_rss_bytes
+
+# Define helper functions; each string test runs once per distinct value
+def filter_criteria(df):
+    keep = ~category_mask(df['User Profile'], lambda v: v.str.contains('OGRDS SYSTEM', na=False))
+    keep &= ~category_mask(df['Changed Using'], lambda v: v.str.contains('ITEM CODING|SURGERY', na=False, case=False))
+    keep &= category_mask(df['Current Destination Item Specificity'], lambda v: v == 'CONSOLIDATED ITEM')
+    keep &= df['Current Nielsen Item Description'].notna().to_numpy()
+    return df[keep]
+
+# Columns the sampling pipeline reads; the low-cardinality ones are loaded as categoricals
+BAU_COLUMNS = [
+    'User Profile',
+    'Changed Using',
+    'Current Destination Item Specificity',
+    'Current Nielsen Item Description',
+    'External Code',
+]
+BAU_CATEGORICAL_COLUMNS = ['User Profile', 'Changed Using', 'Current Destination Item Specificity']
+
+# Stream a BAU export in chunks and keep only the rows that pass
+# filter_criteria and the selected User Profile set, so the full file is
+# never held in memory. User Profile is parsed straight into the registry's
+# categorical dtype. Row labels follow the file, as with a single read_csv.
+# Parsing and filtering are timed separately across the chunks.
+def read_bau_csv(source, profile_set, usecols=None, chunksize=250_000, registry=None, recorder=None):
+    registry = registry or load_registry()
+    recorder = recorder or NULL_RECORDER
+    dtype = {col: 'category' for col in BAU_CATEGORICAL_COLUMNS}
+    dtype['User Profile'] = registry.profile_dtype
+    # Kept as text so every chunk agrees: External Code is the de-dup key and
+    # its leading zeros must survive
+    dtype['External Code'] = str
+    dtype['Current Nielsen Item Description'] = str
+    rss_before = current_rss_bytes()
+    kept = []
+    rows_read = 0
+    read_seconds = filter_seconds = 0.0
+    with pd.read_csv(source, usecols=usecols, dtype=dtype, chunksize=chunksize) as reader:
+        while True:
+            start = time.perf_counter()
+            chunk = next(reader, None)
+            read_seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            rows_read += len(chunk)
+
+            start = time.perf_counter()
+            chunk = filter_criteria(chunk)
+            kept.append(chunk[registry.profile_mask(chunk['User Profile'], profile_set)])
+            filter_seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = pd.concat(kept)
+
+    # Each chunk infers its own categories; re-type the survivors once
+    for col in BAU_CATEGORICAL_COLUMNS:
+        if col in df.columns and col != 'User Profile':
+            df[col] = df[col].astype('category')
+    read_seconds += time.perf_counter() - start
+
+    recorder.record("read_csv", read_seconds, rows_out=rows_read, rss_before_bytes=rss_before)
+    recorder.record("filter_criteria", filter_seconds, rows_in=rows_read, rows_out=len(df))
+    return df
+
+# Module is the first segment of the pipe-delimited item description
+def derive_module(df):
+    return df['Current Nielsen Item Description'].str.split('|').str[0].astype('category')
+
+# Filtered BAU frame with the derived Module column, as the sampling expects it
+def load_bau_frame(source, profile_set, usecols=None, registry=None, recorder=None):
+    recorder = recorder or NULL_RECORDER
+    df = read_bau_csv(source, profile_set, usecols=usecols, registry=registry, recorder=recorder)
+    df['Module'] = recorder.measure("derive_module", lambda: derive_module(df), rows_in=len(df))
+    return df
+
+# Draw up to quotas[group] rows from every group in one pass: shuffle once,
+# then keep the rows whose rank within their group is below the quota
+def draw_per_group(candidates, group_col, quotas, rng):
+    shuffled = candidates.iloc[rng.permutation(len(candidates))]
+    ranks = shuffled.groupby(group_col, sort=False, observed=True).cumcount().to_numpy()
+    positions = quotas.index.get_indexer(shuffled[group_col])
+    limits = np.where(positions >= 0, quotas.to_numpy()[positions], 0)
+    return shuffled[ranks < limits]
+
+# Shortfall of each user against a floor, given what is already sampled
+def _user_shortfall(df_sampled, user_col, floor):
+    sampled_counts = df_sampled[user_col].value_counts().reindex(floor.index, fill_value=0)
+    return np.ceil(floor - sampled_counts).clip(lower=0)
+
+def sample_priority_modules(df, module_col, priority_modules, percentage, random_state=None):
+    rng = np.random.default_rng(random_state)
+    priority_order = {module: position for position, module in enumerate(dict.fromkeys(priority_modules))}
+    candidates = df[df[module_col].isin(list(priority_order))]
+    if candidates.empty:
+        return pd.DataFrame(columns=df.columns), df
+
+    quotas = np.ceil(candidates.groupby(module_col, observed=True).size() * (percentage / 100))
+    sampled_df = draw_per_group(candidates, module_col, quotas, rng)
+
+    # Keep the first draw of each External Code in priority-module order
+    module_rank = sampled_df[module_col].map(priority_order).to_numpy()
+    sampled_df = sampled_df.iloc[np.argsort(module_rank, kind='stable')].drop_duplicates(subset='External Code')
+    remaining_df = df[~df.index.isin(sampled_df.index)]
+    return sampled_df, remaining_df
+
+def ensure_min_samples_per_user(df, df_sampled, df_remaining, user_col, percentage, random_state=None):
+    rng = np.random.default_rng(random_state)
+    min_required = df.groupby(user_col, observed=True).size() * (percentage / 100)
+    needed = _user_shortfall(df_sampled, user_col, min_required)
+    needed = needed[needed > 0]
+
+    candidates = df_remaining[df_remaining[user_col].isin(needed.index)]
+    candidates = candidates.drop_duplicates(subset=[user_col, 'External Code'])
+    additional = draw_per_group(candidates, user_col, needed, rng).sort_values(user_col, kind='stable')
+    return pd.concat([df_sampled, additional]).drop_duplicates(subset='External Code')
+
+def ensure_final_samples(df, df_sampled, user_col, min_samples, random_state=42):
+    rng = np.random.default_rng(random_state)
+    user_entries = df.groupby(user_col, observed=True).size()
+    needed = _user_shortfall(df_sampled, user_col, pd.Series(min_samples, index=user_entries.index))
+    needed = needed[needed > 0]
+
+    candidates = df[~df.index.isin(df_sampled.index) & df[user_col].isin(needed.index)]
+    additional = draw_per_group(candidates, user_col, needed, rng).sort_values(user_col, kind='stable')
+    return pd.concat([df_sampled, additional]).drop_duplicates(subset='External Code').reset_index(drop=True)
+
+# Sample count against total volume per value of `group_col`
+def sample_summary(df, df_sampled, group_col):
+    summary = df_sampled.groupby(group_col, observed=True).size().reset_index(name='Sample Count')
+    total_volume = df.groupby(group_col, observed=True).size().reset_index(name='Total Volume')
+    summary = summary.merge(total_volume, on=group_col, how='left')
+    summary['Percentage'] = (summary['Sample Count'] / summary['Total Volume']) * 100
+    return summary
+
+# Sampling steps followed by the category and user profile summaries.
+# Without a random_state the first two stages are unseeded and the final
+# top-up uses 42, as the page always did.
+def run_bau_sampling(df, priority_modules, priority_percentage, user_percentage, min_samples, random_state=None, recorder=None):
+    recorder = recorder or NULL_RECORDER
+    df_sampled, df_remaining = recorder.measure(
+        "sample_priority_modules",
+        lambda: sample_priority_modules(df, 'Module', priority_modules, priority_percentage, random_state),
+        rows_in=len(df),
+    )
+    df_sampled = recorder.measure(
+        "ensure_min_samples_per_user",
+        lambda: ensure_min_samples_per_user(df, df_sampled, df_remaining, 'User Profile', user_percentage, random_state),
+        rows_in=len(df),
+    )
+    final_state = 42 if random_state is None else random_state
+    df_sampled = recorder.measure(
+        "ensure_final_samples",
+        lambda: ensure_final_samples(df, df_sampled, 'User Profile', min_samples, final_state),
+        rows_in=len(df),
+    )
+    category_summary = recorder.measure("category_summary", lambda: sample_summary(df, df_sampled, 'Module'), rows_in=len(df))
+    user_summary = recorder.measure("user_summary", lambda: sample_summary(df, df_sampled, 'User Profile'), rows_in=len(df))
+    return df_sampled, category_summary, user_summary
@@ -0,0 +1,197 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+import pandas as pd
+
+from audit_core.profiles import load_registry
+from audit_core.profiling import NULL_RECORDER
+
+try:
+    import duckdb
+except ImportError:  # optional out-of-core engine
+    duckdb = None
+
+
+# Copy an uploaded file to a temporary CSV on disk for DuckDB to scan; the
+# directory also takes DuckDB's spill files and is removed afterwards
+@contextmanager
+def spooled_csv(uploaded_file):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "upload.csv")
+        uploaded_file.seek(0)
+        with open(csv_path, "wb") as f:
+            shutil.copyfileobj(uploaded_file, f, 1 << 20)
+        uploaded_file.seek(0)
+        yield csv_path, tmp_dir
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# Random sort key per filtered row: reproducible from the seed when given
+def _draw_key(random_state):
+    if random_state is None:
+        return "random()"
+    return f"hash(f.rowid::BIGINT, {int(random_state)}::BIGINT)"
+
+
+# The BAU pipeline (filter, Module, the three sampling stages and both
+# summaries) run by DuckDB straight over the CSV file. The filtered rows
+# live in a DuckDB temp table that spills to `temp_directory` beyond
+# `memory_limit`; quotas, draws and de-duplication are window functions over
+# row ids, and only the sampled rows and the summaries come back as pandas
+# frames. Mirrors audit_core.bau.run_bau_sampling: same quotas, the same
+# External Code de-duplication order, and seed 42 for the final top-up
+# when no random_state is given.
+def run_bau_sampling_duckdb(
+    csv_path,
+    profile_set,
+    priority_modules,
+    priority_percentage,
+    user_percentage,
+    min_samples,
+    random_state=None,
+    usecols=None,
+    registry=None,
+    memory_limit=None,
+    temp_directory=None,
+    recorder=None,
+):
+    if duckdb is None:
+        raise ImportError("The out-of-core BAU engine needs the duckdb package")
+    registry = registry or load_registry()
+    recorder = recorder or NULL_RECORDER
+
+    con = duckdb.connect()
+    try:
+        if memory_limit:
+            con.execute(f"SET memory_limit = '{memory_limit}'")
+        if temp_directory:
+            con.execute(f"SET temp_directory = '{temp_directory}'")
+        con.execute("SET preserve_insertion_order = true")
+
+        con.register("profiles", pd.DataFrame({"profile": list(registry.profile_sets[profile_set])}))
+        con.register("priority", pd.DataFrame({
+            "module": list(dict.fromkeys(priority_modules)),
+            "priority_rank": range(len(dict.fromkeys(priority_modules))),
+        }))
+
+        # Filter criteria, profile whitelist and Module, in file order
+        columns = ", ".join(_quote(col) for col in usecols) if usecols else "*"
+        recorder.measure("duckdb_filter", lambda: con.execute(f"""
+            CREATE TEMP TABLE filtered AS
+            SELECT {columns}, split_part("Current Nielsen Item Description", '|', 1) AS "Module"
+            FROM read_csv(?, header = true, all_varchar = true)
+            WHERE NOT coalesce(contains("User Profile", 'OGRDS SYSTEM'), false)
+              AND NOT coalesce(regexp_matches("Changed Using", 'ITEM CODING|SURGERY', 'i'), false)
+              AND "Current Destination Item Specificity" = 'CONSOLIDATED ITEM'
+              AND "Current Nielsen Item Description" IS NOT NULL
+              AND "User Profile" IN (SELECT profile FROM profiles)
+        """, [csv_path]))
+
+        # Stage 1: ceil(percentage) of every priority module, first draw of
+        # each External Code kept in priority-module order
+        recorder.measure("sample_priority_modules", lambda: con.execute(f"""
+            CREATE TEMP TABLE sampled AS
+            WITH drawn AS (
+                SELECT f.rowid AS row_id, f."User Profile" AS user_profile, f."External Code" AS external_code,
+                       p.priority_rank AS stage_order,
+                       row_number() OVER (PARTITION BY f."Module" ORDER BY {_draw_key(random_state)}) AS draw_rank,
+                       count(*) OVER (PARTITION BY f."Module") AS module_rows
+                FROM filtered f JOIN priority p ON f."Module" = p.module
+            )
+            SELECT row_id, user_profile, external_code, 1 AS stage, stage_order, draw_rank
+            FROM drawn
+            WHERE draw_rank <= ceil(module_rows * (? / 100))
+            QUALIFY row_number() OVER (PARTITION BY external_code ORDER BY stage_order, draw_rank) = 1
+        """, [float(priority_percentage)]))
+
+        # Stage 2: top users up to their percentage floor from the rows not yet
+        # sampled (one row per External Code and user)
+        recorder.measure("ensure_min_samples_per_user", lambda: _top_up(con, 2, f"""
+            SELECT "User Profile" AS user_profile, count(*) * (? / 100) AS floor
+            FROM filtered GROUP BY 1
+        """, [float(user_percentage)], dedupe_per_user=True, draw_key=_draw_key(random_state)))
+
+        # Stage 3: top users up to min_samples
+        recorder.measure("ensure_final_samples", lambda: _top_up(con, 3, """
+            SELECT "User Profile" AS user_profile, ?::DOUBLE AS floor
+            FROM filtered GROUP BY 1
+        """, [float(min_samples)], dedupe_per_user=False, draw_key=_draw_key(42 if random_state is None else random_state)))
+
+        df_sampled = recorder.measure("fetch_sample", lambda: con.execute("""
+            SELECT f.* FROM sampled s JOIN filtered f ON f.rowid = s.row_id
+            ORDER BY s.stage, s.stage_order, s.draw_rank
+        """).df())
+
+        category_summary = recorder.measure("category_summary", lambda: _summary(con, "Module"))
+        user_summary = recorder.measure("user_summary", lambda: _summary(con, "User Profile"))
+        return df_sampled, category_summary, user_summary
+    finally:
+        con.close()
+
+
+# Add draws for users below `floor_sql` (user_profile, floor) to the sample,
+# then keep the first row of each External Code
+def _top_up(con, stage, floor_sql, params, dedupe_per_user, draw_key):
+    dedupe = (
+        'QUALIFY row_number() OVER (PARTITION BY f."User Profile", f."External Code" ORDER BY f.rowid) = 1'
+        if dedupe_per_user else ""
+    )
+    con.execute(f"""
+        CREATE TEMP TABLE sampled_next AS
+        WITH floors AS ({floor_sql}),
+        have AS (
+            SELECT user_profile, count(*) AS sampled_rows FROM sampled GROUP BY 1
+        ),
+        needed AS (
+            SELECT fl.user_profile, ceil(fl.floor - coalesce(h.sampled_rows, 0)) AS needed
+            FROM floors fl LEFT JOIN have h USING (user_profile)
+            WHERE coalesce(h.sampled_rows, 0) < fl.floor
+        ),
+        candidates AS (
+            SELECT f.rowid AS row_id, f."User Profile" AS user_profile, f."External Code" AS external_code,
+                   {draw_key} AS draw_key
+            FROM filtered f
+            WHERE f."User Profile" IN (SELECT user_profile FROM needed)
+              AND f.rowid NOT IN (SELECT row_id FROM sampled)
+            {dedupe}
+        ),
+        drawn AS (
+            SELECT c.*, row_number() OVER (PARTITION BY c.user_profile ORDER BY c.draw_key) AS draw_rank
+            FROM candidates c
+        ),
+        combined AS (
+            SELECT row_id, user_profile, external_code, stage, stage_order, draw_rank FROM sampled
+            UNION ALL
+            SELECT d.row_id, d.user_profile, d.external_code, {stage} AS stage,
+                   dense_rank() OVER (ORDER BY d.user_profile) AS stage_order, d.draw_rank
+            FROM drawn d JOIN needed n USING (user_profile)
+            WHERE d.draw_rank <= n.needed
+        )
+        SELECT * FROM combined
+        QUALIFY row_number() OVER (PARTITION BY external_code ORDER BY stage, stage_order, draw_rank) = 1
+    """, params)
+    con.execute("DROP TABLE sampled")
+    con.execute("ALTER TABLE sampled_next RENAME TO sampled")
+
+
+# Sample Count / Total Volume / Percentage per value of `group_col`
+def _summary(con, group_col):
+    column = _quote(group_col)
+    return con.execute(f"""
+        WITH sample_counts AS (
+            SELECT f.{column}, count(*) AS "Sample Count"
+            FROM sampled s JOIN filtered f ON f.rowid = s.row_id
+            GROUP BY 1
+        ),
+        volumes AS (
+            SELECT {column}, count(*) AS "Total Volume" FROM filtered GROUP BY 1
+        )
+        SELECT sc.{column}, sc."Sample Count", v."Total Volume",
+               sc."Sample Count" / v."Total Volume" * 100 AS "Percentage"
+        FROM sample_counts sc LEFT JOIN volumes v USING ({column})
+        ORDER BY sc.{column}
+    """).df()
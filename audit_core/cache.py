@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from cachetools import TTLCache
+
+_MISSING = object()
+
+
+# SHA-256 of an uploaded file, read in blocks so the bytes are not copied.
+# Streamlit gives each upload a new file_id, so the digest is kept per id in
+# the session and reruns on the same upload do not read the file again.
+def content_hash(uploaded_file):
+    file_id = getattr(uploaded_file, "file_id", None)
+    hashes = st.session_state.setdefault("upload_hashes", {})
+    if file_id is not None and file_id in hashes:
+        return hashes[file_id]
+
+    hasher = hashlib.sha256()
+    uploaded_file.seek(0)
+    for block in iter(lambda: uploaded_file.read(1 << 20), b""):
+        hasher.update(block)
+    uploaded_file.seek(0)
+    digest = hasher.hexdigest()
+    if file_id is not None:
+        hashes[file_id] = digest
+    return digest
+
+
+# Approximate memory held by a cached value: DataFrames are measured deeply,
+# arrays and bytes by their buffers, tuples/lists/dicts of them are summed
+def _sizeof(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(_sizeof(item) for item in value) or 1
+    if isinstance(value, dict):
+        return sum(_sizeof(item) for item in value.values()) or 1
+    if isinstance(value, np.ndarray):
+        return value.nbytes or 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) or 1
+    return 1
+
+
+# Process-wide cache of parsed uploads and sampling results, shared by all
+# sessions. Entries expire after `ttl` seconds and the least recently used
+# ones are evicted once the cached frames exceed `max_bytes`. Cached frames
+# are shared, so callers must not modify them in place.
+class ResultCache:
+    def __init__(self, max_bytes, ttl):
+        self._cache = TTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=_sizeof)
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = compute()
+        with self._lock:
+            try:
+                self._cache[key] = value
+            except ValueError:  # larger than the whole cache, just don't keep it
+                pass
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+# Sized from AUDIT_CACHE_MAX_MB (default 1024) and AUDIT_CACHE_TTL seconds (default 3600)
+def get_result_cache():
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            max_mb = int(os.environ.get("AUDIT_CACHE_MAX_MB", "1024"))
+            ttl = int(os.environ.get("AUDIT_CACHE_TTL", "3600"))
+            _result_cache = ResultCache(max_mb * 1024 * 1024, ttl)
+        return _result_cache
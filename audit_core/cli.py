@@ -0,0 +1,156 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from audit_core.bau import BAU_COLUMNS, load_bau_frame, run_bau_sampling
+from audit_core.bau_duckdb import run_bau_sampling_duckdb
+from audit_core.ml import DEFAULT_CRITERIA, ML_COLUMNS, load_ml_frame, process_data, reservoir_sample_xlsx
+from audit_core.profiles import load_registry
+from audit_core.xlsx import to_xlsx_bytes
+
+# Suffixes of the files written next to each input; inputs carrying them are skipped
+BAU_OUTPUTS = ("_sampled", "_category_summary", "_user_summary")
+ML_OUTPUTS = ("_audit_samples", "_summary")
+
+
+# Input an earlier run of this tool wrote `path` from, if it is still there
+# (X_sampled.csv next to X.csv); files that only look like outputs are kept
+def _source_of(path):
+    stem, ext = os.path.splitext(path)
+    for suffix in BAU_OUTPUTS + ML_OUTPUTS:
+        if stem.endswith(suffix) and os.path.isfile(stem[:-len(suffix)] + ext):
+            return stem[:-len(suffix)] + ext
+    return None
+
+
+# Files matched by directories (their direct children) or glob patterns,
+# minus earlier outputs of this tool
+def expand_inputs(patterns, extensions):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = sorted(os.path.join(pattern, name) for name in os.listdir(pattern))
+        else:
+            candidates = sorted(glob.glob(pattern, recursive=True))
+        for path in candidates:
+            if not os.path.isfile(path) or os.path.splitext(path)[1].lower() not in extensions:
+                continue
+            source = _source_of(path)
+            if source is not None:
+                print(f"{path}: skipped, output of {os.path.basename(source)}", file=sys.stderr)
+                continue
+            paths.append(path)
+    return list(dict.fromkeys(paths))
+
+
+def output_path(input_path, suffix, ext):
+    return os.path.splitext(input_path)[0] + suffix + ext
+
+
+def run_bau_file(path, profile_set, priority_percentage, user_percentage, min_samples, sampling_columns_only=False, seed=None, engine="pandas"):
+    registry = load_registry()
+    usecols = BAU_COLUMNS if sampling_columns_only else None
+    if engine == "duckdb":
+        outputs = run_bau_sampling_duckdb(
+            path, profile_set, registry.priority_modules, priority_percentage, user_percentage, min_samples,
+            random_state=seed, usecols=usecols, registry=registry,
+        )
+    else:
+        df = load_bau_frame(path, profile_set, usecols=usecols, registry=registry)
+        outputs = run_bau_sampling(df, registry.priority_modules, priority_percentage, user_percentage, min_samples, seed)
+
+    written = []
+    for suffix, frame in zip(BAU_OUTPUTS, outputs):
+        written.append(output_path(path, suffix, ".csv"))
+        frame.to_csv(written[-1], index=False)
+    return written
+
+
+def run_ml_file(path, criteria, sampling_columns_only=False, streaming=False):
+    usecols = ML_COLUMNS if sampling_columns_only else None
+    if streaming:
+        outputs = reservoir_sample_xlsx(path, criteria, usecols=usecols)
+    else:
+        outputs = process_data(load_ml_frame(path, usecols=usecols), criteria)
+
+    written = []
+    for suffix, frame in zip(ML_OUTPUTS, outputs):
+        written.append(output_path(path, suffix, ".xlsx"))
+        with open(written[-1], "wb") as f:
+            f.write(to_xlsx_bytes(frame))
+    return written
+
+
+# Run one pipeline over many files on a process pool; a failing file is
+# reported and does not stop the others. Returns the number of failures.
+def run_batch(task, paths, workers, **params):
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(min(workers, len(paths)), 1)) as executor:
+        futures = {executor.submit(task, path, **params): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                written = future.result()
+            except Exception as exc:
+                failures += 1
+                print(f"{path}: failed: {exc}", file=sys.stderr)
+                continue
+            print(f"{path}: wrote {', '.join(os.path.basename(p) for p in written)}")
+    return failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m audit_core", description="Run the audit sampling pipelines over many exports.")
+    subparsers = parser.add_subparsers(dest="pipeline", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="files processed in parallel (default: CPU count)")
+
+    bau = subparsers.add_parser("bau", parents=[common], help="BAU (OMNI) sampling over CSV exports")
+    bau.add_argument("inputs", nargs="+", help="CSV files, directories or glob patterns")
+    bau.add_argument("--profile-set", default="Both", help="user profile set from user_profiles.json (default: Both)")
+    bau.add_argument("--priority-percentage", type=int, default=40)
+    bau.add_argument("--user-percentage", type=int, default=20)
+    bau.add_argument("--min-samples", type=int, default=50)
+    bau.add_argument("--sampling-columns-only", action="store_true", help="read and write only the columns the sampling uses")
+    bau.add_argument("--seed", type=int, help="seed every sampling stage for reproducible output")
+    bau.add_argument("--engine", choices=["pandas", "duckdb"], default="pandas", help="duckdb runs out of core for exports larger than memory")
+
+    ml = subparsers.add_parser("ml", parents=[common], help="ML audit sampling over XLSX exports")
+    ml.add_argument("inputs", nargs="+", help="XLSX files, directories or glob patterns")
+    ml.add_argument("--criteria", help="JSON file of {change type: {retailer: count}} (default: the page defaults)")
+    ml.add_argument("--sampling-columns-only", action="store_true", help="read and write only the columns the sampling uses")
+    ml.add_argument("--streaming", action="store_true", help="sample in one pass with a reservoir per criteria cell; memory stays bounded by the quotas")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.pipeline == "bau":
+        if args.profile_set not in load_registry().set_names:
+            raise SystemExit(f"Unknown profile set {args.profile_set!r}; choose from {', '.join(load_registry().set_names)}")
+        paths = expand_inputs(args.inputs, {".csv"})
+        params = dict(
+            profile_set=args.profile_set,
+            priority_percentage=args.priority_percentage,
+            user_percentage=args.user_percentage,
+            min_samples=args.min_samples,
+            sampling_columns_only=args.sampling_columns_only,
+            seed=args.seed,
+            engine=args.engine,
+        )
+        task = run_bau_file
+    else:
+        criteria = DEFAULT_CRITERIA
+        if args.criteria:
+            with open(args.criteria, encoding="utf-8") as f:
+                criteria = json.load(f)
+        paths = expand_inputs(args.inputs, {".xlsx"})
+        params = dict(criteria=criteria, sampling_columns_only=args.sampling_columns_only, streaming=args.streaming)
+        task = run_ml_file
+
+    if not paths:
+        raise SystemExit("No input files matched.")
+    return 1 if run_batch(task, paths, args.workers, **params) else 0
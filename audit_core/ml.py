@@ -0,0 +1,191 @@
+import math
+import numpy as np
+import pandas as pd
+
+from audit_core.profiling import NULL_RECORDER
+from audit_core.xlsx import iter_xlsx_rows, read_xlsx
+
+# Columns process_data reads
+ML_COLUMNS = ['Changed Using', 'Processing Group Description']
+
+# Samples per (Changed Using, Retailer) cell unless the user changes them
+DEFAULT_CRITERIA = {
+    "AUTOCODING ETAILER MATCHING": {"B&M": 0, "Amazon": 800, "Ecom": 0},
+    "AUTOCODING TO RECEIPT SCHEMA FOR RECEIPT DATA": {"B&M": 1200, "Amazon": 400, "Ecom": 400},
+    "AUTOCODE TO PREDICTED CI (GENAI)": {"B&M": 300, "Amazon": 0, "Ecom": 0},
+    "UPC MATCHING FOR RECEIPT DATA": {"B&M": 150, "Amazon": 125, "Ecom": 50},
+    "UPC MATCHING FOR DEFERRED CATEGORY": {"B&M": 150, "Amazon": 125, "Ecom": 50},
+    "RCT MATCHING AUTOCODING WITHIN CODE TYPE AND PG": {"B&M": 750, "Amazon": 500, "Ecom": 250},
+}
+
+
+def classify_retailer(description):
+    description = str(description).lower()
+    if "npd amazon (us)" in description:
+        return "Amazon"
+    elif ".com" in description:
+        return "Ecom"
+    else:
+        return "B&M"
+
+
+# classify_retailer over a whole column: the string checks run once per
+# distinct Processing Group Description and are broadcast through the codes
+def classify_retailers(descriptions):
+    codes, uniques = pd.factorize(descriptions)
+    lowered = pd.Series(uniques, dtype=object).astype(str).str.lower()
+    labels = np.select(
+        [lowered.str.contains("npd amazon (us)", regex=False), lowered.str.contains(".com", regex=False)],
+        ["Amazon", "Ecom"],
+        default="B&M",
+    )
+    labels = np.append(labels, classify_retailer(np.nan))  # code -1: missing description
+    return pd.Series(labels[codes], index=descriptions.index)
+
+
+# ML export with its Retailer classification
+def load_ml_frame(source, usecols=None, recorder=None):
+    recorder = recorder or NULL_RECORDER
+    df = recorder.measure("read_excel", lambda: read_xlsx(source, usecols=usecols))
+    df['Retailer'] = recorder.measure("classify_retailers", lambda: classify_retailers(df['Processing Group Description']), rows_in=len(df))
+    return df
+
+
+# Draw every (Changed Using, Retailer) cell of the criteria from one groupby.
+# Each cell uses the same RandomState(42) draw as DataFrame.sample did, so
+# the samples match the per-cell filter-and-sample loop this replaces.
+def process_data(df, criteria, random_state=42):
+    cells = df.groupby(['Changed Using', 'Retailer'], sort=False, observed=True).indices
+    no_rows = np.array([], dtype=np.intp)
+
+    sampled_positions = []
+    summary = []
+    for change_type, retailer_counts in criteria.items():
+        for retailer, count in retailer_counts.items():
+            positions = cells.get((change_type, retailer), no_rows)
+            actual_count = min(count, len(positions))
+            draw = np.random.RandomState(random_state).choice(len(positions), size=actual_count, replace=False)
+            sampled_positions.append(positions[draw])
+            summary.append({
+                "Changed Using": change_type,
+                "Retailer": retailer,
+                "Expected": count,
+                "Actual": actual_count
+            })
+
+    audit_samples = df.take(np.concatenate(sampled_positions)) if sampled_positions else df.iloc[:0]
+    summary_df = pd.DataFrame(summary)
+    return audit_samples, add_summary_totals(summary_df)
+
+
+# Uniform sample of up to `size` items from a stream of unknown length, in
+# one pass (Li's Algorithm L: random draws only at the rows that replace a
+# sampled one). Each reservoir has its own RandomState(seed), so a cell's
+# sample does not depend on the rows of other cells.
+class Reservoir:
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.seen = 0
+        self.items = []
+        self._rng = np.random.RandomState(seed)
+        self._next = None
+
+    def _skip(self):
+        # Advance to the next stream position that enters the reservoir;
+        # uniforms are drawn from (0, 1] so their log is finite
+        self._weight *= math.exp(math.log(1.0 - self._rng.random_sample()) / self.size)
+        self._next += math.floor(math.log(1.0 - self._rng.random_sample()) / math.log1p(-self._weight)) + 1
+
+    # Count one more stream item and return the slot it takes in `items`
+    # (len(items) to append), or None when it is not sampled
+    def offer(self):
+        position = self.seen
+        self.seen += 1
+        if position < self.size:
+            if self.seen == self.size:
+                self._weight = 1.0
+                self._next = position
+                self._skip()
+            return position
+        if position == self._next:
+            slot = self._rng.randint(self.size)
+            self._skip()
+            return slot
+        return None
+
+    def put(self, slot, item):
+        if slot == len(self.items):
+            self.items.append(item)
+        else:
+            self.items[slot] = item
+
+    def add(self, item):
+        slot = self.offer()
+        if slot is not None:
+            self.put(slot, item)
+
+
+# process_data in a single pass over the workbook's rows: each row's
+# retailer is classified as it is read and only rows of the criteria cells
+# are offered to that cell's reservoir, so memory is bounded by the total
+# sample quota rather than the file. Samples are in file order within each
+# cell, indexed by their row position; Expected/Actual come from the
+# reservoir counts. Reproducible for a given random_state, but not the same
+# rows process_data draws.
+def reservoir_sample_xlsx(source, criteria, random_state=42, usecols=None):
+    rows = iter_xlsx_rows(source)
+    header = next(rows)
+    for col in ML_COLUMNS:
+        if col not in header:
+            raise ValueError(f"The workbook has no '{col}' column")
+    change_col = header.index('Changed Using')
+    group_col = header.index('Processing Group Description')
+    keep_cols = [header.index(col) for col in usecols] if usecols else list(range(len(header)))
+    padding = (None,) * len(header)
+
+    reservoirs = {
+        (change_type, retailer): Reservoir(count, random_state)
+        for change_type, retailer_counts in criteria.items()
+        for retailer, count in retailer_counts.items()
+    }
+    retailers = {}  # Processing Group Description -> Retailer, classified once each
+    for position, row in enumerate(rows):
+        if len(row) < len(header):
+            row = tuple(row) + padding[len(row):]
+        description = row[group_col]
+        retailer = retailers.get(description)
+        if retailer is None:
+            retailer = retailers[description] = classify_retailer(np.nan if description is None else description)
+        reservoir = reservoirs.get((row[change_col], retailer))
+        if reservoir is None:
+            continue
+
+        # Only rows entering the reservoir are copied
+        slot = reservoir.offer()
+        if slot is not None:
+            reservoir.put(slot, (position, tuple(row[i] for i in keep_cols) + (retailer,)))
+
+    columns = [header[i] for i in keep_cols] + ['Retailer']
+    sampled = []
+    summary = []
+    for (change_type, retailer), reservoir in reservoirs.items():
+        sampled.extend(sorted(reservoir.items))
+        summary.append({
+            "Changed Using": change_type,
+            "Retailer": retailer,
+            "Expected": reservoir.size,
+            "Actual": len(reservoir.items)
+        })
+
+    audit_samples = pd.DataFrame([values for _, values in sampled], columns=columns, index=[position for position, _ in sampled])
+    return audit_samples, add_summary_totals(pd.DataFrame(summary))
+
+
+def add_summary_totals(summary_df):
+    totals = pd.DataFrame({
+        "Changed Using": ["Total"],
+        "Retailer": ["All"],
+        "Expected": [summary_df['Expected'].sum()],
+        "Actual": [summary_df['Actual'].sum()]
+    })
+    return pd.concat([summary_df, totals], ignore_index=True)
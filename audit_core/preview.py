@@ -0,0 +1,73 @@
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from audit_core.cache import get_result_cache
+from audit_core.profiles import category_mask
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+
+# Row positions of `df` after a case-insensitive substring filter on one
+# column and a stable sort on another (missing values last)
+def preview_positions(df, filter_column=None, filter_text="", sort_column=None, descending=False):
+    positions = np.arange(len(df))
+    if filter_column is not None and filter_text:
+        keep = category_mask(
+            df[filter_column],
+            lambda v: v.astype(str).str.contains(filter_text, case=False, regex=False, na=False),
+        )
+        positions = positions[keep]
+    if sort_column is not None:
+        values = df[sort_column].iloc[positions]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)  # sort by value, not category order
+        values = values.reset_index(drop=True)
+        try:
+            order = values.sort_values(ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+        except TypeError:
+            # Mixed numbers and text cannot be compared; sort those as text
+            as_text = values.astype(str).where(values.notna())
+            order = as_text.sort_values(ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+# One page of the rows at `positions`, limited to `columns`
+def page_window(df, positions, page, page_size, columns=None):
+    start = (page - 1) * page_size
+    window = df.iloc[positions[start:start + page_size]]
+    return window[columns] if columns is not None else window
+
+
+# Paged view of a large result: filtering and sorting run on the server and
+# only the current page of the chosen columns goes to the browser. The full
+# frame stays server-side (and in the result cache) for downloads.
+# `cache_key` identifies the result, so row orders are reused across reruns.
+def paged_preview(df, key, cache_key):
+    all_columns = list(df.columns)
+    with st.expander("Preview options", expanded=False):
+        columns = st.multiselect("Columns", all_columns, default=all_columns, key=f"{key}_columns")
+        filter_col, text_col = st.columns([1, 2])
+        filter_column = filter_col.selectbox("Filter column", [None] + all_columns, key=f"{key}_filter_column")
+        filter_text = text_col.text_input("Contains", key=f"{key}_filter_text", disabled=filter_column is None)
+        sort_col, order_col, size_col = st.columns([2, 1, 1])
+        sort_column = sort_col.selectbox("Sort by", [None] + all_columns, key=f"{key}_sort_column")
+        descending = order_col.checkbox("Descending", key=f"{key}_descending")
+        page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    positions = get_result_cache().get_or_compute(
+        ("preview", cache_key, filter_column, filter_text, sort_column, descending),
+        lambda: preview_positions(df, filter_column, filter_text, sort_column, descending),
+    )
+    page_count = max(math.ceil(len(positions) / page_size), 1)
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count  # a narrower filter left fewer pages
+    page = int(st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key=f"{key}_page"))
+
+    st.dataframe(page_window(df, positions, page, page_size, columns or all_columns))
+    first = (page - 1) * page_size + 1 if len(positions) else 0
+    last = min(page * page_size, len(positions))
+    filtered = f" (filtered from {len(df):,})" if len(positions) != len(df) else ""
+    st.caption(f"Rows {first:,}–{last:,} of {len(positions):,}{filtered}")
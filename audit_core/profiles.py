@@ -0,0 +1,63 @@
+import json
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES_PATH = os.path.join(_ROOT, "user_profiles.json")
+PRIORITY_MODULES_PATH = os.path.join(_ROOT, "priority_modules.json")
+ALL_PROFILES_SET = "Both"
+
+
+# Evaluate a string predicate once per distinct value of a column and
+# broadcast it to the rows through the categorical codes; missing values
+# (code -1) take the extra trailing False
+def category_mask(series, predicate):
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    categories = pd.Series(series.cat.categories, dtype=object)
+    lookup = np.append(predicate(categories).to_numpy(dtype=bool), False)
+    return lookup[series.cat.codes.to_numpy()]
+
+
+# User profile sets and priority modules, with a categorical dtype covering
+# every known profile so whitelist checks are integer-code lookups. The
+# "Both" set is the union of the sets in user_profiles.json.
+class ProfileRegistry:
+    def __init__(self, profile_sets, priority_modules):
+        self.profile_sets = {name: tuple(dict.fromkeys(profiles)) for name, profiles in profile_sets.items()}
+        all_profiles = tuple(dict.fromkeys(p for profiles in self.profile_sets.values() for p in profiles))
+        self.profile_sets[ALL_PROFILES_SET] = all_profiles
+        # Sorted, so summaries grouped on the dtype come out alphabetically
+        self.profile_dtype = pd.CategoricalDtype(sorted(all_profiles))
+
+        # One boolean per profile code (+1 for missing) for each set
+        self._set_lookups = {}
+        for name, profiles in self.profile_sets.items():
+            lookup = np.zeros(len(all_profiles) + 1, dtype=bool)
+            lookup[self.profile_dtype.categories.get_indexer(profiles)] = True
+            self._set_lookups[name] = lookup
+
+        self.priority_modules = tuple(dict.fromkeys(priority_modules))
+        self.priority_module_set = frozenset(self.priority_modules)
+
+    @property
+    def set_names(self):
+        return list(self.profile_sets)
+
+    def profile_mask(self, series, set_name):
+        if series.dtype != self.profile_dtype:
+            series = series.astype(self.profile_dtype)
+        return self._set_lookups[set_name][series.cat.codes.to_numpy()]
+
+
+# Loaded once per process
+@lru_cache(maxsize=None)
+def load_registry(profiles_path=PROFILES_PATH, priority_modules_path=PRIORITY_MODULES_PATH):
+    with open(profiles_path, encoding="utf-8") as f:
+        profile_sets = json.load(f)
+    profile_sets.pop(ALL_PROFILES_SET, None)
+    with open(priority_modules_path, encoding="utf-8") as f:
+        priority_modules = json.load(f)["Priority Modules"]
+    return ProfileRegistry(profile_sets, priority_modules)
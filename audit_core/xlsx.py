@@ -0,0 +1,77 @@
+from io import BytesIO
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+try:
+    import python_calamine  # noqa: F401  Rust-backed reader used through pandas
+    XLSX_READ_ENGINE = "calamine"
+except ImportError:
+    XLSX_READ_ENGINE = "openpyxl"
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+# Read the first sheet of a workbook, optionally only some of its columns
+def read_xlsx(source, usecols=None):
+    return pd.read_excel(source, engine=XLSX_READ_ENGINE, usecols=usecols)
+
+
+# Stream the first sheet of a workbook: yields the header, then each data
+# row as a tuple, without loading the sheet. Blank rows are skipped and
+# unnamed header cells are named as pandas names them.
+def iter_xlsx_rows(source):
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        yield tuple(f"Unnamed: {i}" if name is None else str(name) for i, name in enumerate(header))
+        for row in rows:
+            if any(value is not None for value in row):
+                yield row
+    finally:
+        workbook.close()
+
+
+# Rows of a frame as plain Python values, a block at a time; missing values
+# become None so both writers leave the cell blank
+def _iter_rows(df, block_size=10_000):
+    for start in range(0, len(df), block_size):
+        block = df.iloc[start:start + block_size].astype(object)
+        block = block.where(block.notna(), None)
+        yield from block.itertuples(index=False, name=None)
+
+
+# Serialize a frame to .xlsx bytes, streaming rows so memory stays flat:
+# XlsxWriter in constant_memory mode, or openpyxl's write-only workbook
+# when XlsxWriter is not installed
+def to_xlsx_bytes(df, sheet_name="Sheet1"):
+    buffer = BytesIO()
+    header = [str(col) for col in df.columns]
+
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(buffer, {
+            "constant_memory": True,
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+            "remove_timezone": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        })
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, header)
+        for row_number, row in enumerate(_iter_rows(df), start=1):
+            worksheet.write_row(row_number, 0, row)
+        workbook.close()
+    else:
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(header)
+        for row in _iter_rows(df):
+            worksheet.append(row)
+        workbook.save(buffer)
+
+    return buffer.getvalue()
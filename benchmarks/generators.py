@@ -0,0 +1,152 @@
+import os
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+from audit_core.bau import BAU_CATEGORICAL_COLUMNS
+from audit_core.ml import DEFAULT_CRITERIA
+from audit_core.profiles import ALL_PROFILES_SET, load_registry
+from audit_core.xlsx import to_xlsx_bytes
+
+# Data rows that fit on one worksheet (the header takes the first row)
+EXCEL_MAX_ROWS = 1_048_575
+
+# Rows are generated and written this many at a time
+CHUNK_ROWS = 1_000_000
+
+CHANGED_USING_BAU = {
+    "MANUAL CODING": 0.55,
+    "BULK EDIT": 0.2,
+    "RULE BASED UPDATE": 0.13,
+    "ITEM CODING TOOL": 0.07,
+    "Surgery Screen": 0.05,
+}
+SPECIFICITIES = {"CONSOLIDATED ITEM": 0.85, "ITEM": 0.1, "BRAND": 0.05}
+NON_PRIORITY_MODULES = [f"MODULE {number:03d}" for number in range(400)]
+
+PROCESSING_GROUPS = (
+    [f"NPD AMAZON (US) - GROUP {number}" for number in range(5)]
+    + [f"{name}.COM" for name in ("WALMART", "TARGET", "CHEWY", "INSTACART", "KROGER", "WALGREENS")]
+    + [f"{name} RECEIPTS" for name in ("KROGER", "COSTCO", "PUBLIX", "DOLLAR GENERAL", "ALDI", "MEIJER", "HEB")]
+)
+
+TRACKER_END_DATE = date(2024, 12, 20)
+TRACKER_STATUSES = {"Done": 0.5, "QC OK": 0.2, "Pending": 0.1, None: 0.2}
+
+
+def _choice(rng, weighted, size):
+    values = list(weighted)
+    probabilities = np.array(list(weighted.values()), dtype=float)
+    return np.array(values, dtype=object)[rng.choice(len(values), size=size, p=probabilities / probabilities.sum())]
+
+
+def _codes(prefix, numbers, width):
+    return prefix + pd.Series(numbers).astype(str).str.zfill(width)
+
+
+# BAU export rows, a chunk at a time. User Profile comes from
+# user_profiles.json plus system and unlisted profiles that the filters drop;
+# modules mix the registry's priority modules with others, and External
+# Codes are drawn from a pool smaller than the file so they repeat.
+def iter_bau_chunks(rows, seed=0, chunk_rows=CHUNK_ROWS, registry=None):
+    registry = registry or load_registry()
+    profiles = list(registry.profile_sets[ALL_PROFILES_SET])
+    extra_profiles = ["OGRDS SYSTEM - AUTOCODER", "OGRDS SYSTEM - BATCH", "VENDOR - UNLISTED PROFILE"]
+    profile_pool = np.array(profiles + extra_profiles, dtype=object)
+    profile_weights = np.append(np.full(len(profiles), 0.94 / len(profiles)), np.full(len(extra_profiles), 0.02))
+    modules = np.array(list(registry.priority_modules) + NON_PRIORITY_MODULES, dtype=object)
+    code_pool = max(int(rows * 0.8), 1)
+
+    for chunk_index, start in enumerate(range(0, rows, chunk_rows)):
+        size = min(chunk_rows, rows - start)
+        rng = np.random.default_rng([seed, chunk_index])
+
+        # Half the rows fall in priority modules
+        priority = rng.random(size) < 0.5
+        module_ids = np.where(
+            priority,
+            rng.integers(0, len(registry.priority_modules), size),
+            rng.integers(len(registry.priority_modules), len(modules), size),
+        )
+        description = pd.Series(modules[module_ids]) + _codes("|BRAND ", rng.integers(0, 5_000, size), 4) + _codes("|ITEM ", rng.integers(0, 100_000, size), 6)
+        description[rng.random(size) < 0.02] = np.nan
+
+        yield pd.DataFrame({
+            "Item Id": np.arange(start, start + size),
+            "User Profile": profile_pool[rng.choice(len(profile_pool), size=size, p=profile_weights)],
+            "Changed Using": _choice(rng, CHANGED_USING_BAU, size),
+            "Current Destination Item Specificity": _choice(rng, SPECIFICITIES, size),
+            "Current Nielsen Item Description": description,
+            "External Code": _codes("EXT", rng.integers(0, code_pool, size), 9),
+            "Change Date": pd.Timestamp("2024-12-02") + pd.to_timedelta(rng.integers(0, 30 * 86_400, size), unit="s"),
+        })
+
+
+# A whole BAU export in memory, optionally only some columns, with the
+# low-cardinality columns as categoricals like read_bau_csv produces
+def generate_bau_frame(rows, seed=0, usecols=None, registry=None):
+    chunks = [chunk[usecols] if usecols else chunk for chunk in iter_bau_chunks(rows, seed, registry=registry)]
+    df = pd.concat(chunks, ignore_index=True)
+    for col in BAU_CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def write_bau_csv(path, rows, seed=0, registry=None):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for chunk_index, chunk in enumerate(iter_bau_chunks(rows, seed, registry=registry)):
+            chunk.to_csv(f, index=False, header=chunk_index == 0)
+    return path
+
+
+# ML export rows: the criteria's Changed Using values plus others the
+# sampling ignores, and Processing Group Descriptions covering all three
+# retailer classes
+def generate_ml_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    changed_using = {change_type: 1.0 for change_type in DEFAULT_CRITERIA}
+    changed_using["MANUAL CODING"] = 2.0
+    return pd.DataFrame({
+        "Item Id": np.arange(rows),
+        "Changed Using": _choice(rng, changed_using, rows),
+        "Processing Group Description": np.array(PROCESSING_GROUPS, dtype=object)[rng.integers(0, len(PROCESSING_GROUPS), rows)],
+        "Item Description": _codes("ITEM ", rng.integers(0, 1_000_000, rows), 7),
+    })
+
+
+def write_ml_xlsx(path, rows, seed=0):
+    if rows > EXCEL_MAX_ROWS:
+        raise ValueError(f"An .xlsx sheet holds at most {EXCEL_MAX_ROWS:,} data rows")
+    with open(path, "wb") as f:
+        f.write(to_xlsx_bytes(generate_ml_frame(rows, seed)))
+    return path
+
+
+# A tracker input tree: team folders holding coder folders of .xlsm
+# workbooks, `rows` in total, dated over the `days` days up to `end_date`
+# with a few blank dates. Returns the folder paths that were written.
+def write_tracker_tree(root, rows, seed=0, teams=4, folders_per_team=5, workbooks_per_folder=10, days=30, end_date=TRACKER_END_DATE):
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime([end_date - timedelta(days=offset) for offset in range(days)])
+    names = [f"CODER {number:02d}" for number in range(40)]
+    workbook_count = teams * folders_per_team * workbooks_per_folder
+
+    written = []
+    for number in range(workbook_count):
+        size = rows // workbook_count + (number < rows % workbook_count)
+        folder = os.path.join(root, f"Team {number // (folders_per_team * workbooks_per_folder):02d}", f"Folder {number // workbooks_per_folder:03d}")
+        os.makedirs(folder, exist_ok=True)
+
+        start = rng.uniform(0.3, 0.7, size)
+        df = pd.DataFrame({
+            "Date": pd.Series(dates[rng.integers(0, days, size)]).where(rng.random(size) >= 0.01),
+            "Name": np.array(names, dtype=object)[rng.integers(0, len(names), size)],
+            "START TIME": start,
+            "END TIME": start + rng.uniform(0, 0.01, size),
+            "Auditor's Status": _choice(rng, TRACKER_STATUSES, size),
+        })
+        with open(os.path.join(folder, f"tracker_{number:04d}.xlsm"), "wb") as f:
+            f.write(to_xlsx_bytes(df))
+        written.append(folder)
+    return list(dict.fromkeys(written))
@@ -0,0 +1,235 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from audit_core.bau import (
+    BAU_COLUMNS,
+    derive_module,
+    ensure_final_samples,
+    ensure_min_samples_per_user,
+    filter_criteria,
+    read_bau_csv,
+    sample_priority_modules,
+)
+from audit_core.ml import DEFAULT_CRITERIA, classify_retailers, load_ml_frame, process_data, reservoir_sample_xlsx
+from audit_core.profiles import ALL_PROFILES_SET, load_registry
+from audit_core.profiling import peak_rss_bytes
+from benchmarks.generators import (
+    EXCEL_MAX_ROWS,
+    TRACKER_END_DATE,
+    generate_bau_frame,
+    generate_ml_frame,
+    write_bau_csv,
+    write_ml_xlsx,
+    write_tracker_tree,
+)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(_ROOT, "Auto code"))
+from tracker import consolidate_and_analyze  # noqa: E402
+from workbook_cache import WorkbookCache  # noqa: E402
+
+PIPELINES = ("bau", "ml", "tracker")
+DEFAULT_SIZES = "10k,1M,10M"
+
+# Sampling parameters the BAU page starts with
+BAU_PRIORITY_PERCENTAGE = 40
+BAU_USER_PERCENTAGE = 20
+BAU_MIN_SAMPLES = 50
+
+
+# "10k", "1M", "2.5m" or a plain number of rows
+def parse_size(text):
+    text = text.strip().lower().replace("_", "")
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+def _rows(result):
+    return len(result[0]) if isinstance(result, tuple) else len(result)
+
+
+# Time `func` (best of `repeat` runs), then run it once more under
+# tracemalloc for the peak bytes allocated while it ran. Timed runs are not
+# traced, as tracing slows allocation-heavy code.
+class Bench:
+    def __init__(self, repeat=1, trace_memory=True):
+        self.repeat = repeat
+        self.trace_memory = trace_memory
+        self.records = []
+
+    def measure(self, pipeline, stage, rows, rows_in, func):
+        seconds = float("inf")
+        for _ in range(self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            result = func()
+            seconds = min(seconds, time.perf_counter() - start)
+
+        peak_bytes = None
+        if self.trace_memory:
+            del result
+            gc.collect()
+            tracemalloc.start()
+            try:
+                result = func()
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        record = {
+            "pipeline": pipeline,
+            "stage": stage,
+            "rows": rows,
+            "rows_in": rows_in,
+            "rows_out": _rows(result),
+            "seconds": seconds,
+            "rows_per_second": rows_in / seconds if seconds > 0 else None,
+            "peak_traced_bytes": peak_bytes,
+        }
+        self.records.append(record)
+        print(
+            f"{pipeline:<8} {stage:<28} {rows:>12,} rows  {seconds:9.3f}s  "
+            f"{record['rows_per_second'] or 0:>14,.0f} rows/s"
+            + (f"  peak {peak_bytes / 2**20:9.1f} MiB" if peak_bytes is not None else ""),
+            flush=True,
+        )
+        return result
+
+
+# Generated inputs are kept in the data directory and reused by later runs
+def _cached(path, write):
+    if not os.path.exists(path):
+        write(path + ".tmp")
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def bench_bau(bench, rows, data_dir, seed):
+    registry = load_registry()
+    csv_path = _cached(os.path.join(data_dir, f"bau_{rows}_{seed}.csv"), lambda path: write_bau_csv(path, rows, seed, registry))
+    bench.measure("bau", "read_bau_csv", rows, rows, lambda: read_bau_csv(csv_path, ALL_PROFILES_SET, usecols=BAU_COLUMNS, registry=registry))
+
+    # The helpers run over the same rows held in memory
+    raw = generate_bau_frame(rows, seed, usecols=BAU_COLUMNS, registry=registry)
+    df = bench.measure("bau", "filter_criteria", rows, len(raw), lambda: filter_criteria(raw))
+    del raw
+    df = df[registry.profile_mask(df["User Profile"], ALL_PROFILES_SET)].copy()
+    df["Module"] = bench.measure("bau", "derive_module", rows, len(df), lambda: derive_module(df))
+
+    df_sampled, df_remaining = bench.measure(
+        "bau", "sample_priority_modules", rows, len(df),
+        lambda: sample_priority_modules(df, "Module", registry.priority_modules, BAU_PRIORITY_PERCENTAGE, seed),
+    )
+    df_sampled = bench.measure(
+        "bau", "ensure_min_samples_per_user", rows, len(df),
+        lambda: ensure_min_samples_per_user(df, df_sampled, df_remaining, "User Profile", BAU_USER_PERCENTAGE, seed),
+    )
+    bench.measure(
+        "bau", "ensure_final_samples", rows, len(df),
+        lambda: ensure_final_samples(df, df_sampled, "User Profile", BAU_MIN_SAMPLES, seed),
+    )
+
+
+def bench_ml(bench, rows, data_dir, seed):
+    # A worksheet caps the file size; larger runs only time the sampling
+    if rows <= EXCEL_MAX_ROWS:
+        xlsx_path = _cached(os.path.join(data_dir, f"ml_{rows}_{seed}.xlsx"), lambda path: write_ml_xlsx(path, rows, seed))
+        bench.measure("ml", "load_ml_frame", rows, rows, lambda: load_ml_frame(xlsx_path))
+        bench.measure("ml", "reservoir_sample_xlsx", rows, rows, lambda: reservoir_sample_xlsx(xlsx_path, DEFAULT_CRITERIA))
+    else:
+        print(f"ml       load_ml_frame skipped: {rows:,} rows do not fit on one worksheet", flush=True)
+
+    df = generate_ml_frame(rows, seed)
+    df["Retailer"] = bench.measure("ml", "classify_retailers", rows, rows, lambda: classify_retailers(df["Processing Group Description"]))
+    bench.measure("ml", "process_data", rows, rows, lambda: process_data(df, DEFAULT_CRITERIA))
+
+
+def bench_tracker(bench, rows, data_dir, seed):
+    tree = os.path.join(data_dir, f"tracker_{rows}_{seed}")
+    if not os.path.isdir(tree):
+        write_tracker_tree(tree + ".tmp", rows, seed)
+        os.replace(tree + ".tmp", tree)
+    user_date = TRACKER_END_DATE
+
+    bench.measure("tracker", "consolidate_and_analyze_cold", rows, rows, lambda: consolidate_and_analyze(tree, user_date, WorkbookCache()))
+    workbook_cache = WorkbookCache()
+    consolidate_and_analyze(tree, user_date, workbook_cache)
+    bench.measure("tracker", "consolidate_and_analyze_warm", rows, rows, lambda: consolidate_and_analyze(tree, user_date, workbook_cache))
+
+
+BENCHMARKS = {"bau": bench_bau, "ml": bench_ml, "tracker": bench_tracker}
+
+
+def environment():
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+# Relative change of each stage against an earlier results file
+def compare(records, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["pipeline"], r["stage"], r["rows"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for record in records:
+        before = baseline.get((record["pipeline"], record["stage"], record["rows"]))
+        if before is None:
+            continue
+        print(
+            f"{record['pipeline']:<8} {record['stage']:<28} {record['rows']:>12,} rows  "
+            f"{before['seconds']:9.3f}s -> {record['seconds']:9.3f}s  ({before['seconds'] / record['seconds']:5.2f}x)"
+        )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Time the audit pipelines on synthetic data.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated row counts, e.g. 10k,1M (default {DEFAULT_SIZES})")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES), help="comma-separated subset of bau,ml,tracker")
+    parser.add_argument("--data-dir", default=os.path.join(_ROOT, ".benchmark-data"), help="where generated inputs are kept between runs")
+    parser.add_argument("--output", help="results file (default benchmark-<timestamp>.json in the data directory)")
+    parser.add_argument("--compare", metavar="RESULTS", help="an earlier results file to compare against")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage; the best is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run that measures peak memory")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    pipelines = [name.strip() for name in args.pipelines.split(",") if name.strip()]
+    unknown = sorted(set(pipelines) - set(PIPELINES))
+    if unknown:
+        print(f"Unknown pipelines: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    bench = Bench(repeat=args.repeat, trace_memory=not args.no_memory)
+    for rows in sizes:
+        for pipeline in pipelines:
+            BENCHMARKS[pipeline](bench, rows, args.data_dir, args.seed)
+
+    output = args.output or os.path.join(args.data_dir, f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "peak_rss_bytes": peak_rss_bytes(), "results": bench.records}, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(bench.records, args.compare)
+    return 0
@@ -1,29 +1,45 @@
 import streamlit as st
-import pandas as pd
-import random
-from io import BytesIO
+from audit_core.cache import content_hash, get_result_cache
+from audit_core.ml import DEFAULT_CRITERIA, ML_COLUMNS, load_ml_frame, process_data, reservoir_sample_xlsx
+from audit_core.preview import paged_preview
+from audit_core.profiling import StageRecorder
+from audit_core.xlsx import XLSX_MIME, to_xlsx_bytes
 
 def main():
     st.title("ML Audit")
 
     # File upload
     uploaded_file = st.file_uploader("Upload Excel File", type="xlsx")
-
-    # Initialize default criteria
-    default_criteria = {
-        "AUTOCODING ETAILER MATCHING": {"B&M": 0, "Amazon": 800, "Ecom": 0},
-        "AUTOCODING TO RECEIPT SCHEMA FOR RECEIPT DATA": {"B&M": 1200, "Amazon": 400, "Ecom": 400},
-        "AUTOCODE TO PREDICTED CI (GENAI)": {"B&M": 300, "Amazon": 0, "Ecom": 0},
-        "UPC MATCHING FOR RECEIPT DATA": {"B&M": 150, "Amazon": 125, "Ecom": 50},
-        "UPC MATCHING FOR DEFERRED CATEGORY": {"B&M": 150, "Amazon": 125, "Ecom": 50},
-        "RCT MATCHING AUTOCODING WITHIN CODE TYPE AND PG": {"B&M": 750, "Amazon": 500, "Ecom": 250},
-    }
+    sampling_columns_only = st.sidebar.checkbox(
+        "Load only sampling columns",
+        value=False,
+        help="Reads just the columns the sampling uses, which cuts load time and memory on large files. The downloads then only contain those columns.",
+    )
+    streaming = st.sidebar.checkbox(
+        "Streaming sampling (low memory)",
+        value=False,
+        help="Samples while reading the workbook row by row, keeping only the sampled rows in memory. Slower to read, but memory no longer grows with the file. Draws differ from the in-memory mode.",
+    )
+    paged = st.sidebar.checkbox(
+        "Paged preview",
+        value=True,
+        help="Sends only the current page of the audit samples to the browser, with sorting and filtering done on the server. The downloads always have every row.",
+    )
+
+    # Stage timings are always logged; the panel shows this run's stages
+    show_diagnostics = st.sidebar.checkbox("Show stage diagnostics", value=False)
+    trace_memory = show_diagnostics and st.sidebar.checkbox(
+        "Trace Python allocations",
+        value=False,
+        help="Adds each stage's peak allocation (tracemalloc), at the cost of slower runs.",
+    )
+    recorder = StageRecorder("ml_audit", trace_memory=trace_memory)
 
     # Display current criteria and allow user modifications
     st.subheader(f"CRITERIA")
     user_criteria = {}
 
-    for change_type, retailer_counts in default_criteria.items():
+    for change_type, retailer_counts in DEFAULT_CRITERIA.items():
         st.write(f"###### {change_type}")
         columns = st.columns(len(retailer_counts))  # Create a column for each retailer
         user_criteria[change_type] = {}
@@ -40,83 +56,77 @@ def main():
                 user_criteria[change_type][retailer] = user_count
 
     if uploaded_file:
-        # Load the file
-        df = pd.read_excel(uploaded_file)
-
-        # Classification and Sampling
-        df['Retailer'] = df['Processing Group Description'].apply(classify_retailer)
-        audit_samples, summary = process_data(df, user_criteria)
+        result_cache = get_result_cache()
+        file_key = content_hash(uploaded_file)
+
+        usecols = ML_COLUMNS if sampling_columns_only else None
+        criteria_key = tuple((change_type, tuple(counts.items())) for change_type, counts in user_criteria.items())
+        if streaming:
+            # One pass over the rows, one reservoir per criteria cell
+            sample_key = ("ml_stream_sample", file_key, sampling_columns_only, criteria_key)
+            audit_samples, summary = result_cache.get_or_compute(
+                sample_key,
+                lambda: recorder.measure("reservoir_sample_xlsx", lambda: reservoir_sample_xlsx(uploaded_file, user_criteria, usecols=usecols)),
+            )
+        else:
+            # Load the file and classify retailers once per upload
+            def load_workbook():
+                return load_ml_frame(uploaded_file, usecols=usecols, recorder=recorder)
+
+            df = result_cache.get_or_compute(("ml_frame", file_key, sampling_columns_only), load_workbook)
+
+            # Sampling is cached per upload and criteria grid
+            sample_key = ("ml_sample", file_key, sampling_columns_only, criteria_key)
+            audit_samples, summary = result_cache.get_or_compute(
+                sample_key,
+                lambda: recorder.measure("process_data", lambda: process_data(df, user_criteria), rows_in=len(df)),
+            )
 
         # Display audit samples and summary
         st.write("Audit Samples:")
-        st.dataframe(audit_samples)
+        if paged:
+            paged_preview(audit_samples, "ml_sample", sample_key)
+        else:
+            st.dataframe(audit_samples)
 
         st.write("Summary:")
         st.dataframe(summary)
 
-        # Download the audit samples
-        audit_samples_file = BytesIO()
-        audit_samples.to_excel(audit_samples_file, index=False, engine="openpyxl")
-        audit_samples_file.seek(0)
-        st.download_button(
-            label="Download Audit Samples",
-            data=audit_samples_file,
-            file_name="audit_samples.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-
-        # Download the summary
-        summary_file = BytesIO()
-        summary.to_excel(summary_file, index=False, engine="openpyxl")
-        summary_file.seek(0)
-        st.download_button(
-            label="Download Summary",
-            data=summary_file,
-            file_name="summary.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-
-
-def classify_retailer(description):
-    description = str(description).lower()
-    if "npd amazon (us)" in description:
-        return "Amazon"
-    elif ".com" in description:
-        return "Ecom"
-    else:
-        return "B&M"
-
-
-def process_data(df, criteria):
-    audit_samples = pd.DataFrame()
-    summary = []
-
-    for change_type, retailer_counts in criteria.items():
-        for retailer, count in retailer_counts.items():
-            filtered_data = df[
-                (df['Changed Using'] == change_type) & (df['Retailer'] == retailer)
-            ]
-            actual_count = min(count, len(filtered_data))
-            sampled_data = filtered_data.sample(n=actual_count, random_state=42)
-            audit_samples = pd.concat([audit_samples, sampled_data])
-            summary.append({
-                "Changed Using": change_type,
-                "Retailer": retailer,
-                "Expected": count,
-                "Actual": actual_count
-            })
-
-    summary_df = pd.DataFrame(summary)
-    totals = pd.DataFrame({
-        "Changed Using": ["Total"],
-        "Retailer": ["All"],
-        "Expected": [summary_df['Expected'].sum()],
-        "Actual": [summary_df['Actual'].sum()]
-    })
-    summary_df = pd.concat([summary_df, totals], ignore_index=True)
-
-    return audit_samples, summary_df
-
+        # Workbooks are only built once downloads are requested, then kept
+        # for this upload and criteria
+        export_key = (file_key, streaming, sampling_columns_only, criteria_key)
+        if st.button("Prepare Downloads"):
+            st.session_state["ml_export_key"] = export_key
+
+        if st.session_state.get("ml_export_key") == export_key:
+            audit_samples_file = result_cache.get_or_compute(
+                ("ml_xlsx", "audit_samples") + export_key,
+                lambda: recorder.measure("to_xlsx (audit samples)", lambda: to_xlsx_bytes(audit_samples), rows_in=len(audit_samples)),
+            )
+            st.download_button(
+                label="Download Audit Samples",
+                data=audit_samples_file,
+                file_name="audit_samples.xlsx",
+                mime=XLSX_MIME,
+            )
+
+            summary_file = result_cache.get_or_compute(
+                ("ml_xlsx", "summary") + export_key,
+                lambda: recorder.measure("to_xlsx (summary)", lambda: to_xlsx_bytes(summary), rows_in=len(summary)),
+            )
+            st.download_button(
+                label="Download Summary",
+                data=summary_file,
+                file_name="summary.xlsx",
+                mime=XLSX_MIME,
+            )
+
+        if show_diagnostics:
+            st.sidebar.subheader("Stage diagnostics")
+            if recorder.records:
+                st.sidebar.dataframe(recorder.frame(), hide_index=True)
+            else:
+                st.sidebar.caption("Every stage was served from the cache on this run.")
 
 if __name__ == "__main__":
     main()